@@ -1,73 +1,122 @@
 # api.py
-# Run with: uvicorn api:app --reload
+# Run with: uvicorn api:app --reload  (development, single worker)
+# Production: gunicorn api:app -c gunicorn_conf.py  (one process per worker)
 
 from fastapi import FastAPI, UploadFile, HTTPException
-from typing import List, Dict
-from datetime import date
-import shutil
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
+import tempfile
+from typing import BinaryIO
 
 # Import your existing logic!
 from traffic_analysis import (
-    parse_file, 
-    total_cars, 
-    cars_per_day, 
-    top_three_half_hours, 
-    min_1_5_hour_window,
-    HalfHourRecord
+    parse_bytes,
+    parse_columns,
+    sort_columns,
+    analyze_columns,
 )
 
+# Uploads up to this size are parsed in memory. Larger ones are parsed straight
+# from Starlette's on-disk spool file, memory-mapped (run_spilled_pipeline).
+IN_MEMORY_UPLOAD_BYTES = 64 * 1024 * 1024
+
+# Uploads larger than this are rejected before any parsing happens.
+MAX_UPLOAD_BYTES = 2 * 1024 * 1024 * 1024
+
+# Parsing and analysis are CPU-bound; they run here so the event loop stays free
+# to accept other uploads while a file is being analysed.
+_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count())
+
 app = FastAPI(title="Traffic Analysis Microservice")
 
-@app.post("/analyze")
+
+def _analysis_body(timestamps, counts, filename: str) -> dict:
+    """
+    Sorts and analyses the parsed columns, returning the response body.
+    """
+    if counts.size == 0:
+        raise HTTPException(status_code=400, detail="No valid records found in file.")
+
+    # Ensure sorted order (Just like in main!)
+    timestamps, counts = sort_columns(timestamps, counts)
+
+    # Perform all analyses in a single pass
+    analysis = analyze_columns(timestamps, counts)
+
+    # Return structured JSON
+    return {
+        "meta": {
+            "filename": filename,
+            "records_processed": int(counts.size)
+        },
+        "analysis": {
+            "total_cars": analysis.total,
+            # orjson serializes the date keys and datetime values (ISO 8601) in C
+            "cars_per_day": analysis.per_day,
+            "top_3_periods": [
+                {"timestamp": r.timestamp, "count": r.count} for r in analysis.top3
+            ],
+            "lowest_1_5_hour_window": [
+                {"timestamp": r.timestamp, "count": r.count} for r in analysis.window
+            ]
+        }
+    }
+
+
+def run_pipeline(data: bytes, filename: str) -> dict:
+    """
+    Parses, sorts and analyses the uploaded file contents (blocking), returning the response body.
+    """
+    # Reuse core logic from traffic_analysis.py
+    return _analysis_body(*parse_bytes(data), filename)
+
+
+def run_spilled_pipeline(upload: BinaryIO, filename: str) -> dict:
+    """
+    Blocking pipeline for large uploads: memory-maps the file Starlette already
+    spooled the upload to (no second copy), and writes the parsed columns to
+    memory-mapped files in a temporary directory, so the OS page cache (not the
+    process heap) holds the working set.
+    The directory is removed once the response body (plain Python objects) is built.
+    """
+    with tempfile.TemporaryDirectory(prefix="traffic_") as spill_dir:
+        return _analysis_body(*parse_columns(upload, spill_dir), filename)
+
+
+@app.post("/analyze", response_class=ORJSONResponse)
 async def analyze_traffic_file(file: UploadFile):
     """
     Endpoint to upload a raw traffic file and get full analysis JSON.
     """
-    temp_filename = f"temp_{file.filename}"
-    
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_BYTES} byte limit.")
+
+    loop = asyncio.get_running_loop()
     try:
-        # 1. Save uploaded file temporarily
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # 2. Reuse core logic from traffic_analysis.py
-        records = parse_file(temp_filename)
-        
-        if not records:
-            raise HTTPException(status_code=400, detail="No valid records found in file.")
-
-        # Ensure sorted order (Just like in main!)
-        records.sort(key=lambda r: r.timestamp)
-
-        # 3. Perform Analyses
-        total = total_cars(records)
-        daily_counts = cars_per_day(records)
-        top_3 = top_three_half_hours(records)
-        min_window = min_1_5_hour_window(records)
-
-        # 4. Return structured JSON
-        return {
-            "meta": {
-                "filename": file.filename,
-                "records_processed": len(records)
-            },
-            "analysis": {
-                "total_cars": total,
-                "cars_per_day": {d.isoformat(): count for d, count in daily_counts.items()},
-                "top_3_periods": [
-                    {"timestamp": r.timestamp, "count": r.count} for r in top_3
-                ],
-                "lowest_1_5_hour_window": [
-                    {"timestamp": r.timestamp, "count": r.count} for r in min_window
-                ]
-            }
-        }
+        if file.size is not None and file.size > IN_MEMORY_UPLOAD_BYTES:
+            # 1. Large upload: parse it from its spool file in the worker thread pool
+            result = await loop.run_in_executor(_EXECUTOR, run_spilled_pipeline, file.file, file.filename)
+        else:
+            # 1. Small (or unknown-size) upload: read it into memory, at most one byte past the limit
+            data = await file.read(IN_MEMORY_UPLOAD_BYTES + 1)
+            if len(data) > IN_MEMORY_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"File exceeds the {IN_MEMORY_UPLOAD_BYTES} byte limit.")
+
+            # 2. Run the CPU-bound pipeline in the worker thread pool
+            result = await loop.run_in_executor(_EXECUTOR, run_pipeline, data, file.filename)
+
+        try:
+            # Returning the response directly also skips FastAPI's jsonable_encoder pass
+            return ORJSONResponse(result)
+        except TypeError:
+            # orjson only encodes 64-bit integers; larger sums take the stdlib encoder
+            return JSONResponse(jsonable_encoder(result))
 
+    except HTTPException:
+        # Keep deliberate client errors (e.g. 400 for a file with no records)
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-        
-    finally:
-        # Cleanup: Remove the temp file to keep the server clean
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
\ No newline at end of file
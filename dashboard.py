@@ -2,12 +2,25 @@
 
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import pandas as pd
 
 # Define the local API endpoint
 API_URL = "http://api:8000/analyze"
 
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """
+    One HTTP session per dashboard process, so every analysis reuses the
+    kept-alive connection to the API instead of opening a new one.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    return session
+
+
 st.set_page_config(layout="wide", page_title="Traffic Analysis Dashboard")
 
 st.title("🚗 SEEK Traffic Counter Analysis")
@@ -19,11 +32,13 @@ uploaded_file = st.file_uploader("Upload your traffic file (sample.txt):", type=
 if uploaded_file is not None:
     with st.spinner("Processing file through FastAPI service..."):
         try:
-            # 1. Prepare the file for the POST request
-            files = {"file": uploaded_file.getvalue()}
+            # 1. Prepare the file for the POST request: pass the file object itself
+            # rather than a getvalue() copy of its contents
+            uploaded_file.seek(0)
+            files = {"file": (uploaded_file.name, uploaded_file, "text/plain")}
             
             # 2. Call the FastAPI endpoint
-            response = requests.post(API_URL, files=files)
+            response = get_session().post(API_URL, files=files)
             
             # Raise exception for bad status codes (e.g., 500 from FastAPI)
             response.raise_for_status()
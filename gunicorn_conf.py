@@ -0,0 +1,19 @@
+# gunicorn_conf.py
+# Run with: gunicorn api:app -c gunicorn_conf.py
+#
+# Production settings for the FastAPI service. Parsing and analysis are CPU-bound
+# and hold the GIL, so throughput scales with worker processes, not threads.
+
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# (2 x cores) + 1, overridable with the conventional WEB_CONCURRENCY variable
+workers = int(os.environ.get("WEB_CONCURRENCY", 2 * multiprocessing.cpu_count() + 1))
+
+# Uvicorn picks uvloop and httptools automatically when installed (uvicorn[standard])
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# No per-request access log lines
+accesslog = None
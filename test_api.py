@@ -0,0 +1,99 @@
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+import api
+
+client = TestClient(api.app)
+
+SAMPLE = (Path(__file__).parent / "sample.txt").read_bytes()
+
+
+def post(content: bytes, filename: str = "sample.txt"):
+    """Helper function to upload `content` to /analyze as a multipart file."""
+    return client.post("/analyze", files={"file": (filename, content)})
+
+
+def test_analyze_sample_file():
+    """Verifies the response body, including orjson's ISO 8601 date keys and timestamps."""
+    response = post(SAMPLE)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["meta"] == {"filename": "sample.txt", "records_processed": 24}
+    assert body["analysis"] == {
+        "total_cars": 398,
+        "cars_per_day": {"2021-12-01": 179, "2021-12-05": 81, "2021-12-08": 134, "2021-12-09": 4},
+        "top_3_periods": [
+            {"timestamp": "2021-12-01T07:30:00", "count": 46},
+            {"timestamp": "2021-12-01T08:00:00", "count": 42},
+            {"timestamp": "2021-12-08T18:00:00", "count": 33},
+        ],
+        "lowest_1_5_hour_window": [
+            {"timestamp": "2021-12-01T15:00:00", "count": 9},
+            {"timestamp": "2021-12-01T15:30:00", "count": 11},
+            {"timestamp": "2021-12-01T23:30:00", "count": 0},
+        ],
+    }
+
+
+def test_analyze_no_valid_records():
+    """Verifies a file without valid records is a 400, not wrapped into a 500."""
+    for content in (b"", b"BAD_TIMESTAMP 10\n"):
+        response = post(content)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "No valid records found in file."
+
+
+def test_analyze_upload_too_large(monkeypatch):
+    """Verifies uploads above MAX_UPLOAD_BYTES are rejected with a 413 before parsing."""
+    monkeypatch.setattr(api, "MAX_UPLOAD_BYTES", len(SAMPLE) - 1)
+    monkeypatch.setattr(api, "run_pipeline", pytest.fail)
+
+    assert post(SAMPLE).status_code == 413
+
+
+def test_analyze_unknown_size_over_in_memory_limit(monkeypatch):
+    """Verifies an upload of unknown size is read at most one byte past IN_MEMORY_UPLOAD_BYTES, then a 413."""
+    monkeypatch.setattr(api, "IN_MEMORY_UPLOAD_BYTES", len(SAMPLE) - 1)
+    upload = UploadFile(io.BytesIO(SAMPLE), filename="sample.txt", size=None)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(api.analyze_traffic_file(upload))
+    assert excinfo.value.status_code == 413
+
+
+def test_analyze_large_upload_is_spilled(monkeypatch):
+    """Verifies uploads above IN_MEMORY_UPLOAD_BYTES take the memory-mapped path, with the same body."""
+    expected = post(SAMPLE).json()
+    spilled = []
+
+    def spy(upload, filename):
+        spilled.append(filename)
+        return run_spilled_pipeline(upload, filename)
+
+    run_spilled_pipeline = api.run_spilled_pipeline
+    monkeypatch.setattr(api, "IN_MEMORY_UPLOAD_BYTES", 16)
+    monkeypatch.setattr(api, "run_spilled_pipeline", spy)
+    monkeypatch.setattr(api, "run_pipeline", pytest.fail)
+
+    response = post(SAMPLE)
+
+    assert response.status_code == 200
+    assert response.json() == expected
+    assert spilled == ["sample.txt"]
+
+
+def test_analyze_totals_beyond_64_bits():
+    """Verifies sums orjson cannot encode fall back to the stdlib encoder instead of a 500."""
+    count = 9_000_000_000_000_000_000
+    content = "".join(f"2021-12-01T0{h}:00:00 {count}\n" for h in range(5, 8)).encode()
+
+    response = post(content)
+
+    assert response.status_code == 200
+    assert response.json()["analysis"]["total_cars"] == 3 * count
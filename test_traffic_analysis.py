@@ -1,5 +1,6 @@
 import io
 from datetime import datetime, date
+import numpy as np
 from traffic_analysis import (
     HalfHourRecord,
     total_cars,
@@ -7,7 +8,15 @@ from traffic_analysis import (
     top_three_half_hours,
     min_1_5_hour_window,
     parse_file,
+    analyze_all,
+    analyze_columns,
+    parse_columns,
+    parse_bytes,
+    records_to_columns,
+    columns_to_records,
+    sort_columns,
 )
+from traffic_analysis import _loadtxt_columns
 
 
 def make_record(ts: str, count: int) -> HalfHourRecord:
@@ -44,6 +53,26 @@ BAD_TIMESTAMP 10             # Expected to be skipped (bad format)
     assert records[2].count == 20
 
 
+def test_tab_separated_extra_field_warning(tmp_path, capsys):
+    """
+    Verifies tab-separated extra fields are reported as a wrong field count, not a
+    parse error, and that mixed tab/space separators split like str.split().
+    """
+    test_file = tmp_path / "test_tabs.txt"
+    test_file.write_text(
+        "2021-12-01T05:00:00 5\textra\n2021-12-01T05:30:00\t5 extra\n"
+        "2021-12-01T06:00:00 7\n2021-12-01T06:30:00\t 9\n"
+    )
+
+    records = parse_file(str(test_file))
+
+    assert records == [make_record("2021-12-01T06:00:00", 7), make_record("2021-12-01T06:30:00", 9)]
+    err = capsys.readouterr().err
+    assert "Line 1 has incorrect number of fields" in err
+    assert "Line 2 has incorrect number of fields" in err
+    assert "failed parsing" not in err
+
+
 def test_top_three_half_hours_with_tie():
     """
     Verifies that when counts are equal (a tie), the earlier timestamp is ranked higher.
@@ -165,6 +194,22 @@ def test_less_than_three_records():
     window = min_1_5_hour_window(records)
     assert [r.count for r in window] == [5, 10]
 
+def test_min_1_5_hour_window_beyond_int64():
+    """Tests the sliding window with counts and window sums that do not fit in int64."""
+    huge = 2**63
+    records = [
+        make_record("2021-12-01T05:00:00", huge),
+        make_record("2021-12-01T05:30:00", 1),
+        make_record("2021-12-01T06:00:00", 2),
+        make_record("2021-12-01T06:30:00", 3),
+    ]
+    assert [r.count for r in min_1_5_hour_window(records)] == [1, 2, 3]
+
+    # Each count fits in int64, but the first window sum (2**63) would wrap to the minimum
+    big = 2**62
+    records = [make_record(f"2021-12-01T0{h}:00:00", c) for h, c in enumerate([big, big, 0, 1], 5)]
+    assert [r.count for r in min_1_5_hour_window(records)] == [big, 0, 1]
+
 def test_multiple_days_per_day_aggregation():
     """Tests aggregation across two distinct days."""
     records = [
@@ -175,4 +220,246 @@ def test_multiple_days_per_day_aggregation():
     ]
     per_day = cars_per_day(records)
     assert per_day[date(2021, 12, 1)] == 15
-    assert per_day[date(2021, 12, 2)] == 10
\ No newline at end of file
+    assert per_day[date(2021, 12, 2)] == 10
+
+def test_cars_per_day_unsorted_input():
+    """Tests that records of the same day are merged even when they are not contiguous."""
+    records = [
+        make_record("2021-12-01T05:00:00", 5),
+        make_record("2021-12-02T06:00:00", 3),
+        make_record("2021-12-01T05:30:00", 10),
+    ]
+    assert cars_per_day(records) == {date(2021, 12, 1): 15, date(2021, 12, 2): 3}
+
+# --- COLUMNAR (NUMPY) API ---
+
+def test_columns_round_trip():
+    """Verifies records survive conversion to int64 columns and back unchanged."""
+    records = [
+        make_record("2021-12-01T05:00:00", 5),
+        make_record("2021-12-02T23:30:00", 10),
+    ]
+    timestamps, counts = records_to_columns(records)
+    assert timestamps.dtype == counts.dtype == "int64"
+    assert columns_to_records(timestamps, counts) == records
+
+
+def test_parse_columns_keeps_fractional_seconds(tmp_path):
+    """Verifies fractional seconds accepted by parse_file are neither truncated nor merged into ties."""
+    test_file = tmp_path / "test_fractional.txt"
+    test_file.write_text("2021-12-01T05:00:00.500000 9\n2021-12-01T05:00:00 2\n")
+
+    timestamps, counts = sort_columns(*parse_columns(str(test_file)))
+
+    assert columns_to_records(timestamps, counts) == [
+        make_record("2021-12-01T05:00:00", 2),
+        make_record("2021-12-01T05:00:00.500000", 9),
+    ]
+
+
+def test_parse_columns_matches_parse_file(tmp_path):
+    """Verifies the columnar parser skips the same malformed lines as parse_file."""
+    # Each line on its own, so lines NumPy would accept are not hidden by another bad line
+    bad_lines = [
+        "BAD_TIMESTAMP 10",
+        "2021-12-01T05:30:00 20 extra",
+        "now 9",
+        "today 5",
+        "2021 5",
+        "2021-12 5",
+        "0000-12-01T05:00:00 3",
+        "NaT 4",
+    ]
+    for bad_line in bad_lines:
+        test_file = tmp_path / "test_columns.txt"
+        test_file.write_text(f"2021-12-01T05:00:00 5\n{bad_line}\n2021-12-01T06:00:00 7\n")
+        timestamps, counts = parse_columns(str(test_file))
+        assert columns_to_records(timestamps, counts) == parse_file(str(test_file)), bad_line
+
+
+def test_parse_columns_offsets_and_int64_overflow(tmp_path):
+    """Verifies offset timestamps become naive UTC and counts beyond int64 are skipped, instead of raising."""
+    content = (
+        "2021-12-01T05:00:00+00:00 5\n"
+        "2021-12-01T15:30:00+10:00 7\n"
+        "2021-12-01T06:00:00 99999999999999999999\n"
+        "2021-12-01T06:30:00 3\n"
+    )
+    test_file = tmp_path / "test_offsets.txt"
+    test_file.write_text(content)
+    expected = [
+        make_record("2021-12-01T05:00:00", 5),
+        make_record("2021-12-01T05:30:00", 7),
+        make_record("2021-12-01T06:30:00", 3),
+    ]
+    assert columns_to_records(*parse_columns(str(test_file))) == expected
+    assert columns_to_records(*parse_bytes(content.encode())) == expected
+
+
+def test_parse_columns_well_formed_file(tmp_path):
+    """Verifies the vectorized fast path on a clean file, including blank lines and an empty file."""
+    test_file = tmp_path / "test_clean.txt"
+    test_file.write_text("2021-12-01T05:00:00 5\n\n2021-12-01T05:30:00 12\n")
+    timestamps, counts = parse_columns(str(test_file))
+    assert columns_to_records(timestamps, counts) == [
+        make_record("2021-12-01T05:00:00", 5),
+        make_record("2021-12-01T05:30:00", 12),
+    ]
+
+    empty_file = tmp_path / "test_empty.txt"
+    empty_file.write_text("")
+    timestamps, counts = parse_columns(str(empty_file))
+    assert counts.size == 0
+
+
+def test_loadtxt_columns_tab_separated(tmp_path):
+    """Verifies well-formed tab-separated files are parsed by the np.loadtxt fast path."""
+    test_file = tmp_path / "test_tabs.txt"
+    test_file.write_text("2021-12-01T05:00:00\t5\n2021-12-01T05:30:00\t12\n")
+
+    columns = _loadtxt_columns(str(test_file))
+
+    assert columns is not None
+    assert columns_to_records(*columns) == parse_file(str(test_file))
+
+
+def test_parse_bytes_matches_parse_columns(tmp_path):
+    """Verifies in-memory parsing agrees with file parsing on clean and malformed content."""
+    clean = b"2021-12-01T05:00:00 5\n2021-12-01T05:30:00 12\n"
+    malformed = b"2021-12-01T05:00:00 5\r\nBAD_TIMESTAMP 10\r\n2021-12-01T05:30:00 12\r\n"
+    for content in (clean, malformed):
+        test_file = tmp_path / "test_bytes.txt"
+        test_file.write_bytes(content)
+        expected = columns_to_records(*parse_columns(str(test_file)))
+        assert columns_to_records(*parse_bytes(content)) == expected
+        assert columns_to_records(*parse_bytes(memoryview(content))) == expected
+
+
+def test_parse_columns_memmap_spill(tmp_path):
+    """Verifies the output columns are memory-mapped into the spill directory with unchanged values."""
+    test_file = tmp_path / "test_spill.txt"
+    test_file.write_text("2021-12-01T05:00:00 5\n2021-12-01T05:30:00 12\n")
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+
+    timestamps, counts = parse_columns(str(test_file), spill_dir=str(spill_dir))
+    assert isinstance(timestamps, np.memmap) and isinstance(counts, np.memmap)
+    assert sorted(p.name for p in spill_dir.iterdir()) == ["counts.i8", "timestamps.i8"]
+    assert columns_to_records(timestamps, counts) == parse_file(str(test_file))
+
+
+def test_parse_columns_file_object(tmp_path):
+    """Verifies an open binary file is parsed like its path, with every parser rewinding it."""
+    for content in (b"2021-12-01T05:00:00 5\n2021-12-01T05:30:00 7\n", b"2021-12-01T05:00:00 5\nBAD 1\n"):
+        test_file = tmp_path / "test_file_object.txt"
+        test_file.write_bytes(content)
+        with open(test_file, "rb") as f:
+            f.read()
+            assert columns_to_records(*parse_columns(f)) == parse_file(str(test_file))
+            assert not f.closed
+
+
+def test_parse_bytes_calendar_validation():
+    """Verifies the compiled parser accepts leap days and rejects impossible dates like fromisoformat."""
+    timestamps, counts = parse_bytes(b"2024-02-29T23:30:00 7\r\n\r\n1999-12-31T00:00:00 3\n")
+    assert columns_to_records(timestamps, counts) == [
+        make_record("2024-02-29T23:30:00", 7),
+        make_record("1999-12-31T00:00:00", 3),
+    ]
+
+    # 2021 is not a leap year: the line is skipped by the fallback parser
+    timestamps, counts = parse_bytes(b"2021-02-29T00:00:00 7\n2021-03-01T00:00:00 3\n")
+    assert columns_to_records(timestamps, counts) == [make_record("2021-03-01T00:00:00", 3)]
+
+
+def test_columnar_analyses_match_record_analyses():
+    """Verifies the columnar analysis of sorted columns agrees with every record-based analysis."""
+    records = [
+        make_record("2021-12-02T06:00:00", 3),
+        make_record("2021-12-01T05:00:00", 5),
+        make_record("2021-12-01T06:00:00", 15),
+        make_record("2021-12-01T05:30:00", 15),
+        make_record("2021-12-02T06:30:00", 7),
+    ]
+    records.sort(key=lambda r: r.timestamp)
+    timestamps, counts = sort_columns(*records_to_columns(list(reversed(records))))
+
+    analysis = analyze_columns(timestamps, counts)
+    assert analysis.total == total_cars(records)
+    assert analysis.per_day == cars_per_day(records)
+    assert analysis.top3 == top_three_half_hours(records)
+    assert analysis.window == min_1_5_hour_window(records)
+
+
+def test_analyze_columns_top_three_tie_at_cutoff():
+    """Verifies the earliest rows are kept when several tie for 3rd place."""
+    records = [
+        make_record("2021-12-01T09:00:00", 15),
+        make_record("2021-12-01T07:00:00", 25),
+        make_record("2021-12-01T08:00:00", 15),
+        make_record("2021-12-01T05:00:00", 15),
+        make_record("2021-12-01T06:00:00", 10),
+    ]
+    assert analyze_columns(*records_to_columns(records)).top3 == [
+        make_record("2021-12-01T07:00:00", 25),
+        make_record("2021-12-01T05:00:00", 15),
+        make_record("2021-12-01T08:00:00", 15),
+    ]
+
+
+def test_analyze_columns_per_day_unsorted_input():
+    """Verifies the columnar per-day totals do not depend on the input being sorted."""
+    records = [
+        make_record("2021-12-01T05:00:00", 5),
+        make_record("2021-12-02T06:00:00", 3),
+        make_record("2021-12-01T05:30:00", 10),
+    ]
+    assert analyze_columns(*records_to_columns(records)).per_day == cars_per_day(records)
+
+
+# --- FUSED SINGLE-PASS ANALYSIS ---
+
+def test_analyze_all_matches_separate_analyses():
+    """Verifies the single-pass analysis agrees with the four separate functions, ties included."""
+    records = [
+        make_record("2021-12-01T07:00:00", 25),
+        make_record("2021-12-02T08:00:00", 15),
+        make_record("2021-12-01T06:00:00", 15),
+        make_record("2021-12-01T09:00:00", 10),
+        make_record("2021-12-02T05:00:00", 15),
+        make_record("2021-12-02T05:30:00", 1),
+    ]
+    for subset in (records, records[:2], []):
+        analysis = analyze_all(subset)
+        assert analysis.total == total_cars(subset)
+        assert analysis.per_day == cars_per_day(subset)
+        assert analysis.top3 == top_three_half_hours(subset)
+        assert analysis.window == min_1_5_hour_window(subset)
+
+
+def test_analyze_columns_matches_analyze_all():
+    """Verifies the compiled single-pass analysis agrees with analyze_all on sorted columns."""
+    records = [
+        make_record("2021-12-01T05:00:00", 5),
+        make_record("2021-12-01T05:30:00", 20),
+        make_record("2021-12-01T06:00:00", 20),
+        make_record("2021-12-02T06:30:00", 8),
+        make_record("2021-12-02T07:00:00", 0),
+        make_record("2021-12-03T07:30:00", 20),
+    ]
+    for subset in (records, records[:2], []):
+        timestamps, counts = records_to_columns(subset)
+        assert analyze_columns(timestamps, counts) == analyze_all(subset)
+
+
+def test_analyze_columns_int64_overflow():
+    """Verifies sums beyond int64 fall back to exact Python ints instead of wrapping around."""
+    records = [
+        make_record("2021-12-01T05:00:00", 9_000_000_000_000_000_000),
+        make_record("2021-12-01T05:30:00", 9_000_000_000_000_000_000),
+        make_record("2021-12-01T06:00:00", 1),
+        make_record("2021-12-02T06:00:00", -9_000_000_000_000_000_000),
+    ]
+    analysis = analyze_columns(*records_to_columns(records))
+    assert analysis == analyze_all(records)
+    assert analysis.total == 9_000_000_000_000_000_001
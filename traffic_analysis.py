@@ -10,69 +10,312 @@ This script reads a file of half-hour car counts and performs four analyses:
 
 It prioritizes correctness, high performance (O(N) algorithms) and robustness 
 by handling file parsing errors gracefully.
+
+Two equivalent APIs are provided:
+- The record API (List[HalfHourRecord]) used by the tests and small inputs.
+- The columnar API (parallel int64 NumPy arrays of Unix microseconds and counts) used
+  by main() and the FastAPI service for large inputs.
 """
 
 from __future__ import annotations
 
+import heapq
+import io
+import os
 import sys
-from dataclasses import dataclass
-from datetime import datetime, date
-from typing import List, Tuple, Dict
-
-
-@dataclass
-class HalfHourRecord:
+import warnings
+from collections import defaultdict
+from datetime import datetime, date, timedelta, timezone
+from itertools import groupby
+from operator import attrgetter
+from typing import List, Tuple, Dict, Optional, Iterable, Union, BinaryIO, NamedTuple
+
+import numpy as np
+
+from utils_numba import analyze_kernel, min_window_kernel, newline_count_kernel, parse_ascii_kernel
+
+
+# Naive timestamps are mapped to microseconds (the resolution of datetime) since
+# this (naive) epoch, matching NumPy's datetime64 semantics, so no timezone
+# conversion is ever applied and fractional seconds survive the round trip.
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+_INT64_MIN, _INT64_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
+MICROSECONDS_PER_DAY = 86400 * 1_000_000
+
+# Fast-path row layout: a canonical 19-byte ISO timestamp and an integer count.
+# One spare byte lets longer (possibly truncated) timestamps be detected.
+_ROW_DTYPE = np.dtype([("ts", "S20"), ("c", "i8")])
+_TS_WIDTH = 19
+_TS_SEPARATORS = ((4, "-"), (7, "-"), (10, "T"), (13, ":"), (16, ":"))
+_MIN_DATETIME64 = np.datetime64("0001-01-01T00:00:00", "s")
+
+# C-level accessor, avoids a Python frame per record in map()/fromiter().
+_get_count = attrgetter("count")
+
+
+class HalfHourRecord(NamedTuple):
+    # A NamedTuple has no per-instance __dict__, and fields are C-level tuple slots.
+    # dataclass(slots=True) is 8 bytes smaller, but records are immutable values shared
+    # by the analysis results, and dataclass(slots=True, frozen=True) is ~40% slower
+    # to construct than a NamedTuple.
     timestamp: datetime
     count: int
 
 
-def parse_file(path: str) -> List[HalfHourRecord]:
+class TrafficAnalysis(NamedTuple):
+    """Results of all four analyses, as computed by analyze_all / analyze_columns."""
+    total: int
+    per_day: Dict[date, int]
+    top3: List[HalfHourRecord]
+    window: List[HalfHourRecord]
+
+
+def records_to_columns(records: List[HalfHourRecord]) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Reads the input file, parses lines into HalfHourRecord objects, and handles 
-    malformed lines (bad format, non-numeric data) gracefully by logging errors to stderr.
+    Converts records into parallel int64 arrays: (timestamps in Unix microseconds, counts).
+    """
+    # Exact integer microseconds from timedelta floor division; about 5x faster than
+    # letting NumPy convert each datetime object to datetime64.
+    timestamps = np.fromiter(
+        ((r.timestamp - _EPOCH) // _ONE_MICROSECOND for r in records), dtype=np.int64, count=len(records)
+    )
+    counts = np.fromiter(map(_get_count, records), dtype=np.int64, count=len(records))
+    return timestamps, counts
+
+
+def columns_to_records(timestamps: np.ndarray, counts: np.ndarray) -> List[HalfHourRecord]:
+    """
+    Converts parallel int64 arrays back into HalfHourRecord objects.
+    Only used at the API boundary on a handful of selected rows.
+    """
+    return [
+        HalfHourRecord(_EPOCH + timedelta(microseconds=int(ts)), int(c))
+        for ts, c in zip(timestamps, counts)
+    ]
+
+
+def _parse_lines(lines: Iterable[str], columnar: bool = False) -> List[HalfHourRecord]:
+    """
+    Parses lines into HalfHourRecord objects, and handles malformed lines
+    (bad format, non-numeric data) gracefully by logging errors to stderr.
+    With `columnar`, records are also made representable as int64 columns:
+    timestamps with a UTC offset are converted to naive UTC, and counts outside
+    the int64 range are skipped, each with a warning.
     """
     records: List[HalfHourRecord] = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-            
-            try:
+    # Hot-loop names bound to locals (LOAD_FAST instead of global/attribute lookups)
+    append = records.append
+    # Deliberately not memoized: timestamps within a file are unique, so an LRU cache
+    # never hits on large files and only adds a lookup per line.
+    fromisoformat = datetime.fromisoformat
+    to_int = int
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        
+        # Validation is exception-driven on purpose: a precompiled regex fullmatch per
+        # line is ~2.5x slower than partition() on valid lines, and every malformed
+        # line already prints a warning, which costs more than raising ValueError.
+        try:
+            # One partition instead of split(): no list allocation per line
+            ts_str, sep, count_str = line.partition(" ")
+            count_str = count_str.lstrip()
+            # isprintable() is False for any whitespace other than " " (tabs, ...)
+            if not sep or " " in count_str or not line.isprintable():
+                # Unusual separators (e.g. tabs) or a wrong field count
                 parts = line.split()
                 if len(parts) != 2:
                     print(f"Warning: Line {line_num} has incorrect number of fields (expected 2): '{line}'. Skipping.", file=sys.stderr)
                     continue
-                    
                 ts_str, count_str = parts
-                
-                ts = datetime.fromisoformat(ts_str)
-                count = int(count_str)
-                
-                records.append(HalfHourRecord(timestamp=ts, count=count))
-
-            except ValueError as e:
-                # Catches bad timestamps (not ISO) or bad counts (not integer)
-                print(f"Error: Line {line_num} failed parsing ('{line}'): {e}. Skipping.", file=sys.stderr)
-            except Exception as e:
-                # Catch any other unexpected error
-                print(f"Fatal Error: Line {line_num} failed with unexpected error: {e}. Skipping.", file=sys.stderr)
+            
+            ts = fromisoformat(ts_str)
+            count = to_int(count_str)
+
+            if columnar:
+                if not _INT64_MIN <= count <= _INT64_MAX:
+                    print(f"Error: Line {line_num} count out of int64 range ('{line}'). Skipping.", file=sys.stderr)
+                    continue
+                if ts.tzinfo is not None:
+                    print(f"Warning: Line {line_num} has a UTC offset ('{line}'). Converted to UTC.", file=sys.stderr)
+                    ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+            
+            append(HalfHourRecord(ts, count))
+
+        except ValueError as e:
+            # Catches bad timestamps (not ISO) or bad counts (not integer)
+            print(f"Error: Line {line_num} failed parsing ('{line}'): {e}. Skipping.", file=sys.stderr)
+        except Exception as e:
+            # Catch any other unexpected error
+            print(f"Fatal Error: Line {line_num} failed with unexpected error: {e}. Skipping.", file=sys.stderr)
 
     return records
 
 
+def parse_file(path: str) -> List[HalfHourRecord]:
+    """
+    Reads the input file, parses lines into HalfHourRecord objects, and handles 
+    malformed lines (bad format, non-numeric data) gracefully by logging errors to stderr.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return _parse_lines(f)
+
+
+def _is_canonical_timestamp(ts: np.ndarray) -> bool:
+    """
+    True if every S20 timestamp is exactly 19 bytes, with '-', 'T' and ':' at the
+    positions of YYYY-MM-DDTHH:MM:SS.
+    """
+    if not (np.char.str_len(ts) == _TS_WIDTH).all():
+        return False
+    # rows["ts"] is a strided field view; the byte view needs a contiguous copy
+    chars = np.ascontiguousarray(ts).view(np.uint8).reshape(ts.size, _ROW_DTYPE["ts"].itemsize)
+    return all((chars[:, pos] == ord(sep)).all() for pos, sep in _TS_SEPARATORS)
+
+
+def _loadtxt_columns(source: Union[str, BinaryIO]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Vectorized parse of a well-formed file (path or binary file object) in a single
+    np.loadtxt pass. Returns None if any line is malformed, so the caller can fall
+    back to the line-by-line parser.
+    """
+    try:
+        with warnings.catch_warnings():
+            # An empty file is valid input; loadtxt would warn about it.
+            warnings.simplefilter("ignore", UserWarning)
+            rows = np.loadtxt(source, dtype=_ROW_DTYPE, comments=None, ndmin=1)
+    except ValueError:
+        return None
+
+    ts = rows["ts"]
+    # NumPy's datetime64 parser accepts far more than datetime.fromisoformat
+    # ("now", "today", "2021", "2021-12", offsets, ...), so only the canonical
+    # YYYY-MM-DDTHH:MM:SS layout is allowed through here.
+    if ts.size and not _is_canonical_timestamp(ts):
+        return None
+    try:
+        timestamps = ts.astype("datetime64[us]")
+    except ValueError:
+        # Out-of-range fields, e.g. month 13 or Feb 30
+        return None
+
+    # Years before 0001 (and "NaT") are rejected by datetime.fromisoformat.
+    if np.isnat(timestamps).any() or (timestamps < _MIN_DATETIME64).any():
+        return None
+    return timestamps.view(np.int64), np.ascontiguousarray(rows["c"])
+
+
+def _empty_column(name: str, rows: int, spill_dir: Optional[str]) -> np.ndarray:
+    """
+    Allocates an int64 output column: an np.memmap file in `spill_dir` if one is
+    given, so the OS page cache can evict it, otherwise an in-memory array.
+    """
+    if spill_dir is not None:
+        return np.memmap(os.path.join(spill_dir, f"{name}.i8"), dtype=np.int64, mode="w+", shape=(rows,))
+    return np.empty(rows, dtype=np.int64)
+
+
+def _ascii_columns(
+    data: np.ndarray, spill_dir: Optional[str] = None
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Compiled parse of strictly formatted `YYYY-MM-DDTHH:MM:SS <count>` content,
+    given as a read-only uint8 array (in memory or memory-mapped).
+    Returns None at the first line in any other format.
+    """
+    # One output slot per line; blank lines just leave unused slots at the end.
+    max_rows = newline_count_kernel(data) + 1
+    timestamps = _empty_column("timestamps", max_rows, spill_dir)
+    counts = _empty_column("counts", max_rows, spill_dir)
+    rows = parse_ascii_kernel(data, timestamps, counts)
+    if rows < 0:
+        return None
+    return timestamps[:rows], counts[:rows]
+
+
+def parse_bytes(buf: Union[bytes, memoryview]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses file contents that are already in RAM (e.g. an HTTP upload) into parallel
+    int64 arrays: (timestamps in Unix microseconds, counts), trying the fastest parser first:
+    1. The Numba kernel, for strictly formatted content.
+    2. np.loadtxt, for other well-formed content (e.g. tab separators).
+    3. The line-by-line parser, which skips and reports malformed lines on stderr.
+    """
+    columns = _ascii_columns(np.frombuffer(buf, dtype=np.uint8))
+    if columns is None:
+        columns = _loadtxt_columns(io.BytesIO(buf))
+    if columns is None:
+        # newline=None gives the same universal-newline splitting as open()
+        columns = records_to_columns(
+            _parse_lines(io.StringIO(str(buf, "utf-8"), newline=None), columnar=True)
+        )
+    return columns
+
+
+def parse_columns(
+    source: Union[str, BinaryIO], spill_dir: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads the input file into parallel int64 arrays: (timestamps in Unix microseconds, counts).
+    `source` is a path or a binary file object backed by a real file descriptor (e.g.
+    an upload Starlette has already spooled to disk), which is read from the start.
+    Malformed lines are handled as in parse_file (plus the int64/UTC-offset rules of
+    the columnar line parser), with the same parser order as parse_bytes.
+    The file is memory-mapped rather than read into RAM; if `spill_dir` is given,
+    the output columns of the Numba kernel are np.memmap files in it too, so files
+    larger than RAM can be analysed. The caller owns that directory and its cleanup.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return parse_columns(f, spill_dir)
+
+    fd = source.fileno()
+    if os.fstat(fd).st_size:
+        data = np.memmap(source, dtype=np.uint8, mode="r")
+    else:
+        # np.memmap cannot map an empty file
+        data = np.frombuffer(b"", dtype=np.uint8)
+    columns = _ascii_columns(data, spill_dir)
+    if columns is None:
+        source.seek(0)
+        columns = _loadtxt_columns(source)
+    if columns is None:
+        # A second handle on the same descriptor; closefd=False leaves `source` open.
+        # Rewind the descriptor itself: a buffered seek(0) may not move it.
+        os.lseek(fd, 0, os.SEEK_SET)
+        with open(fd, "r", encoding="utf-8", closefd=False) as f:
+            columns = records_to_columns(_parse_lines(f, columnar=True))
+    return columns
+
+
+def sort_columns(timestamps: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns both arrays reordered chronologically.
+    A stable sort keeps duplicate timestamps in input order, like list.sort().
+    Already sorted input (the usual case for counter files) is detected in one
+    vectorized pass and returned as-is.
+    """
+    if np.all(timestamps[1:] >= timestamps[:-1]):
+        return timestamps, counts
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], counts[order]
+
+
 def total_cars(records: List[HalfHourRecord]) -> int:
     """Calculates the sum of all car counts across all records."""
-    return sum(r.count for r in records)
+    return sum(map(_get_count, records))
 
 
 def cars_per_day(records: List[HalfHourRecord]) -> Dict[date, int]:
     """Aggregates car counts, summing totals for each day."""
-    per_day: Dict[date, int] = {}
-    for r in records:
-        d = r.timestamp.date()
-        per_day[d] = per_day.get(d, 0) + r.count
-    return per_day
+    per_day: Dict[date, int] = defaultdict(int)
+    # Each run of consecutive same-day records (a whole day, for sorted input) is
+    # summed in C and merged into the dict once, instead of once per record.
+    for d, group in groupby(records, key=lambda r: r.timestamp.date()):
+        per_day[d] += sum(map(_get_count, group))
+    return dict(per_day)
 
 
 def top_three_half_hours(records: List[HalfHourRecord]) -> List[HalfHourRecord]:
@@ -80,11 +323,13 @@ def top_three_half_hours(records: List[HalfHourRecord]) -> List[HalfHourRecord]:
     Returns the top 3 HalfHourRecord objects with the highest car counts.
     Ties are broken by the earliest timestamp.
     """
-    return sorted(
+    # O(N log 3) with a 3-element heap instead of sorting the whole list.
+    return heapq.nsmallest(
+        3,
         records,
-        # Sorts descending by count (-r.count) and ascending by timestamp (r.timestamp) as a tie-breaker.
+        # Orders descending by count (-r.count) and ascending by timestamp (r.timestamp) as a tie-breaker.
         key=lambda r: (-r.count, r.timestamp),
-    )[:3]
+    )
 
 
 def min_1_5_hour_window(records: List[HalfHourRecord]) -> List[HalfHourRecord]:
@@ -95,6 +340,25 @@ def min_1_5_hour_window(records: List[HalfHourRecord]) -> List[HalfHourRecord]:
         # With fewer than 3 records, just return all of them
         return records[:]
 
+    # The O(N) sliding window runs as compiled code in utils_numba.min_window_kernel.
+    try:
+        counts = np.fromiter(map(_get_count, records), dtype=np.int64, count=len(records))
+    except OverflowError:
+        # A count outside int64: parse_file keeps these, only the columnar parsers skip them
+        best_start = -1
+    else:
+        best_start = min_window_kernel(counts)
+    if best_start < 0:
+        best_start = _min_window_start(records)
+
+    return records[best_start : best_start + 3]
+
+
+def _min_window_start(records: List[HalfHourRecord]) -> int:
+    """
+    Pure-Python sliding window for min_1_5_hour_window, used when counts or their
+    sums do not fit in int64. Expects at least 3 records.
+    """
     best_start = 0
     # Initialize the first window sum
     best_sum = sum(r.count for r in records[0:3])
@@ -103,14 +367,81 @@ def min_1_5_hour_window(records: List[HalfHourRecord]) -> List[HalfHourRecord]:
     # Iterate through possible start indices, stopping 2 records before the end
     for start in range(1, len(records) - 2):
         # Slide window by 1: remove previous, add new
-        current_sum -= records[start - 1].count # Remove count of the record leaving the window
-        current_sum += records[start + 2].count # Add count of the new record entering the window
+        current_sum -= records[start - 1].count
+        current_sum += records[start + 2].count
 
         if current_sum < best_sum:
             best_sum = current_sum
             best_start = start
 
-    return records[best_start : best_start + 3]
+    return best_start
+
+
+def analyze_all(records: List[HalfHourRecord]) -> TrafficAnalysis:
+    """
+    Computes all four analyses in a single pass over the records, with the same
+    results as calling total_cars, cars_per_day, top_three_half_hours and
+    min_1_5_hour_window separately.
+    """
+    total = 0
+    per_day: Dict[date, int] = defaultdict(int)
+    top3: List[HalfHourRecord] = []
+    best_start = 0
+    best_sum = window_sum = sum(map(_get_count, records[:3]))
+
+    for i, r in enumerate(records):
+        count = r.count
+        ts = r.timestamp
+        total += count
+        per_day[ts.date()] += count
+
+        # Keep top3 ordered by (-count, timestamp); equal keys keep input order
+        j = len(top3)
+        while j and (count > top3[j - 1].count or (count == top3[j - 1].count and ts < top3[j - 1].timestamp)):
+            j -= 1
+        if j < 3:
+            top3.insert(j, r)
+            del top3[3:]
+
+        # Slide the 3-record window once it is full
+        if i >= 3:
+            window_sum += count - records[i - 3].count
+            if window_sum < best_sum:
+                best_sum = window_sum
+                best_start = i - 2
+
+    return TrafficAnalysis(total, dict(per_day), top3, records[best_start : best_start + 3])
+
+
+def analyze_columns(timestamps: np.ndarray, counts: np.ndarray) -> TrafficAnalysis:
+    """
+    Columnar version of analyze_all: one compiled pass (utils_numba.analyze_kernel)
+    instead of one pass per analysis. Expects chronologically sorted arrays
+    (see sort_columns), like min_1_5_hour_window.
+    Sums that would overflow int64 are recomputed with Python ints by analyze_all.
+    """
+    n = counts.size
+    day_ids = np.empty(n, dtype=np.int64)
+    day_sums = np.empty(n, dtype=np.int64)
+    top = np.empty(3, dtype=np.int64)
+    total, runs, n_top, start = analyze_kernel(timestamps, counts, MICROSECONDS_PER_DAY, day_ids, day_sums, top)
+    if runs < 0:
+        # Only reachable with counts near the int64 limits, so the slow path is fine
+        return analyze_all(columns_to_records(timestamps, counts))
+
+    # For sorted input there is one run per day; unsorted runs are merged here.
+    per_day: Dict[date, int] = defaultdict(int)
+    for d, day_total in zip(day_ids[:runs].tolist(), day_sums[:runs].tolist()):
+        per_day[_EPOCH.date() + timedelta(days=d)] += day_total
+
+    top = top[:n_top]
+    window = slice(start, start + 3)
+    return TrafficAnalysis(
+        int(total),
+        dict(per_day),
+        columns_to_records(timestamps[top], counts[top]),
+        columns_to_records(timestamps[window], counts[window]),
+    )
 
 
 def format_record(r: HalfHourRecord) -> str:
@@ -123,9 +454,9 @@ def main(argv: List[str]) -> int:
         return 1
 
     input_path = argv[1]
-    records = parse_file(input_path)
+    timestamps, counts = parse_columns(input_path)
 
-    if not records:
+    if counts.size == 0:
         # No data case: print zeros or a clear message
         #print(0)
         # Optionally: you can print nothing else or a note:
@@ -134,29 +465,28 @@ def main(argv: List[str]) -> int:
     
     # SENIOR FIX: Ensure the list is chronologically sorted for correctness, 
     # which is mandatory for the min_1_5_hour_window contiguous index check.
-    # O(N log N) cost is paid once here.
-    records.sort(key=lambda r: r.timestamp)
+    # O(N log N) cost is paid once here, as a single argsort over int64 microseconds.
+    timestamps, counts = sort_columns(timestamps, counts)
+
 
+    # All four analyses in a single pass
+    analysis = analyze_columns(timestamps, counts)
 
     # 1) Total cars
     #print("--- 1. Total Cars ---", file=sys.stderr)
-    #total = total_cars(records)
-    total = total_cars(records)
-    print(total)
+    print(analysis.total)
 
     # 2) Cars per day (sorted by date)
-    per_day = cars_per_day(records)
+    per_day = analysis.per_day
     for d in sorted(per_day.keys()):
         print(f"{d.isoformat()} {per_day[d]}")
 
     # 3) Top 3 half-hours
-    top3 = top_three_half_hours(records)
-    for r in top3:
+    for r in analysis.top3:
         print(format_record(r))
 
     # 4) 1.5 hour period with least cars (3 contiguous records)
-    window = min_1_5_hour_window(records)
-    for r in window:
+    for r in analysis.window:
         print(format_record(r))
 
     return 0
@@ -0,0 +1,275 @@
+"""
+Numba-compiled kernels for the traffic analyses.
+
+The kernels operate on the raw file bytes and on the int64 columns produced by
+traffic_analysis.parse_columns.
+Each one is declared with an explicit signature, so it is compiled (or loaded from
+the on-disk cache) once at import time instead of on the first request.
+The public kernels never touch Python objects and are declared nogil, so /analyze
+worker threads (and the event loop) keep running while one of them executes.
+"""
+
+from numba import njit, int64, types
+
+# Read-only view of the raw file bytes, as returned by np.frombuffer(buf, np.uint8).
+_bytes_array = types.Array(types.uint8, 1, "C", readonly=True)
+
+_NEWLINE = 10
+_CARRIAGE_RETURN = 13
+_SPACE = 32
+_DASH = 45
+_COLON = 58
+_T = 84
+_ZERO = 48
+_MICROSECONDS_PER_SECOND = 1000000
+# Longest count accepted, so parsing a single count cannot overflow int64.
+_MAX_COUNT_DIGITS = 18
+
+
+@njit(int64(int64, int64, int64), cache=True)
+def _add_overflow_bits(a, b, result):
+    """Negative iff result = a + b wrapped around int64 (a and b share a sign, result has the other)."""
+    return (a ^ result) & (b ^ result)
+
+
+@njit(int64(int64, int64, int64), cache=True)
+def _sub_overflow_bits(a, b, result):
+    """Negative iff result = a - b wrapped around int64."""
+    return (a ^ b) & (a ^ result)
+
+
+@njit(int64(int64[:]), cache=True, nogil=True, boundscheck=False)
+def min_window_kernel(counts):
+    """
+    Returns the start index of the 3 contiguous counts with the smallest sum
+    (0 when there are fewer than 3 counts). Ties keep the earliest window.
+    Returns -1 if any window sum would overflow int64.
+    """
+    n = counts.shape[0]
+    if n < 3:
+        return 0
+
+    # Sign bit set once any sum has wrapped around; checked once after the loop
+    overflow = 0
+    pair_sum = counts[0] + counts[1]
+    overflow |= _add_overflow_bits(counts[0], counts[1], pair_sum)
+    best_sum = pair_sum + counts[2]
+    overflow |= _add_overflow_bits(pair_sum, counts[2], best_sum)
+    best_start = 0
+
+    current_sum = best_sum
+    for start in range(1, n - 2):
+        # Slide window by 1: add the count entering, remove the count leaving
+        entering = counts[start + 2]
+        leaving = counts[start - 1]
+        grown = current_sum + entering
+        overflow |= _add_overflow_bits(current_sum, entering, grown)
+        current_sum = grown - leaving
+        overflow |= _sub_overflow_bits(grown, leaving, current_sum)
+
+        if current_sum < best_sum:
+            best_sum = current_sum
+            best_start = start
+
+    if overflow < 0:
+        return -1
+    return best_start
+
+
+@njit(int64(_bytes_array, int64, int64), cache=True, boundscheck=False)
+def _read_digits(buf, pos, width):
+    """Returns the value of `width` ASCII digits starting at `pos`, or -1 if any is not a digit."""
+    value = 0
+    for j in range(pos, pos + width):
+        digit = buf[j] - _ZERO
+        if digit < 0 or digit > 9:
+            return -1
+        value = value * 10 + digit
+    return value
+
+
+@njit(int64(int64, int64, int64), cache=True)
+def _days_from_civil(year, month, day):
+    """
+    Days since 1970-01-01 of a proleptic Gregorian date (Howard Hinnant's algorithm).
+    """
+    if month <= 2:
+        year -= 1
+    era = year // 400
+    yoe = year - era * 400
+    mp = month - 3 if month > 2 else month + 9
+    doy = (153 * mp + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+@njit(int64(int64, int64), cache=True)
+def _days_in_month(year, month):
+    if month == 2:
+        leap = (year % 4 == 0 and year % 100 != 0) or year % 400 == 0
+        return 29 if leap else 28
+    if month == 4 or month == 6 or month == 9 or month == 11:
+        return 30
+    return 31
+
+
+@njit(int64(_bytes_array, int64[:], int64[:]), cache=True, nogil=True, boundscheck=False)
+def parse_ascii_kernel(buf, ts_out, c_out):
+    """
+    Parses `YYYY-MM-DDTHH:MM:SS <count>` lines from raw ASCII bytes into
+    `ts_out` (Unix microseconds) and `c_out`, which must hold one slot per line.
+    Blank lines and CRLF endings are accepted. Returns the number of rows
+    written, or -1 at the first line not in exactly this format, so the
+    caller can fall back to the tolerant parser.
+    """
+    n = buf.shape[0]
+    i = 0
+    row = 0
+    while i < n:
+        # Skip blank lines
+        if buf[i] == _NEWLINE:
+            i += 1
+            continue
+        if buf[i] == _CARRIAGE_RETURN and i + 1 < n and buf[i + 1] == _NEWLINE:
+            i += 2
+            continue
+
+        # Fixed-width timestamp, followed by at least one space
+        if i + 20 > n:
+            return -1
+        if (buf[i + 4] != _DASH or buf[i + 7] != _DASH or buf[i + 10] != _T
+                or buf[i + 13] != _COLON or buf[i + 16] != _COLON or buf[i + 19] != _SPACE):
+            return -1
+        year = _read_digits(buf, i, 4)
+        month = _read_digits(buf, i + 5, 2)
+        day = _read_digits(buf, i + 8, 2)
+        hour = _read_digits(buf, i + 11, 2)
+        minute = _read_digits(buf, i + 14, 2)
+        second = _read_digits(buf, i + 17, 2)
+        if year < 1 or month < 1 or month > 12 or day < 1 or hour < 0 or hour > 23 \
+                or minute < 0 or minute > 59 or second < 0 or second > 59:
+            return -1
+        if day > _days_in_month(year, month):
+            return -1
+        i += 20
+        while i < n and buf[i] == _SPACE:
+            i += 1
+
+        # Non-negative integer count
+        count = 0
+        digits = 0
+        while i < n and _ZERO <= buf[i] <= _ZERO + 9:
+            count = count * 10 + (buf[i] - _ZERO)
+            digits += 1
+            i += 1
+        if digits == 0 or digits > _MAX_COUNT_DIGITS:
+            return -1
+
+        # End of line (optionally CRLF) or end of buffer
+        if i < n and buf[i] == _CARRIAGE_RETURN:
+            i += 1
+        if i < n:
+            if buf[i] != _NEWLINE:
+                return -1
+            i += 1
+
+        seconds = _days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+        ts_out[row] = seconds * _MICROSECONDS_PER_SECOND
+        c_out[row] = count
+        row += 1
+
+    return row
+
+
+@njit(
+    types.UniTuple(int64, 4)(int64[:], int64[:], int64, int64[:], int64[:], int64[:]),
+    cache=True,
+    nogil=True,
+    boundscheck=False,
+)
+def analyze_kernel(timestamps, counts, ticks_per_day, day_ids_out, day_sums_out, top_out):
+    """
+    Computes all four analyses in a single pass over chronologically ordered columns.
+    Writes the runs of equal days to `day_ids_out`/`day_sums_out` (one slot per row)
+    and the indices of the top 3 rows to `top_out` (3 slots), ranked by descending
+    count, then earliest timestamp, then input order. `ticks_per_day` is the
+    length of a day in the unit of `timestamps`.
+    Returns (total, number of day runs, number of top rows, min window start), or
+    a run count of -1 if any sum would overflow int64.
+    """
+    n = counts.shape[0]
+    total = 0
+    runs = 0
+    filled = 0
+
+    best_start = 0
+    best_sum = 0
+    current_sum = 0
+    # Sign bit set once any sum has wrapped around; checked once after the loop
+    overflow = 0
+
+    for i in range(n):
+        c = counts[i]
+        t = timestamps[i]
+
+        # 1) Total cars
+        new_total = total + c
+        overflow |= _add_overflow_bits(total, c, new_total)
+        total = new_total
+
+        # 2) Cars per day: extend the current run of equal days or start a new one
+        d = t // ticks_per_day
+        if runs > 0 and day_ids_out[runs - 1] == d:
+            day_sum = day_sums_out[runs - 1]
+            new_day_sum = day_sum + c
+            overflow |= _add_overflow_bits(day_sum, c, new_day_sum)
+            day_sums_out[runs - 1] = new_day_sum
+        else:
+            day_ids_out[runs] = d
+            day_sums_out[runs] = c
+            runs += 1
+
+        # 3) Top 3: find the rank of row i among the current top rows
+        j = filled
+        while j > 0:
+            p = top_out[j - 1]
+            if c > counts[p] or (c == counts[p] and t < timestamps[p]):
+                j -= 1
+            else:
+                break
+        if j < 3:
+            # Shift lower-ranked rows down (dropping the 4th) and insert
+            m = filled if filled < 3 else 2
+            while m > j:
+                top_out[m] = top_out[m - 1]
+                m -= 1
+            top_out[j] = i
+            if filled < 3:
+                filled += 1
+
+        # 4) 1.5 hour window: sum of rows i-2..i, kept only for the first minimum
+        window_sum = current_sum + c
+        overflow |= _add_overflow_bits(current_sum, c, window_sum)
+        current_sum = window_sum
+        if i >= 3:
+            leaving = counts[i - 3]
+            window_sum = current_sum - leaving
+            overflow |= _sub_overflow_bits(current_sum, leaving, window_sum)
+            current_sum = window_sum
+        if i == 2 or (i > 2 and current_sum < best_sum):
+            best_sum = current_sum
+            best_start = i - 2
+
+    if overflow < 0:
+        return 0, -1, 0, 0
+    return total, runs, filled, best_start
+
+
+@njit(int64(_bytes_array), cache=True, nogil=True, boundscheck=False)
+def newline_count_kernel(buf):
+    """Counts '\\n' bytes without the N-byte temporary of np.count_nonzero(buf == 10)."""
+    total = 0
+    for i in range(buf.shape[0]):
+        if buf[i] == _NEWLINE:
+            total += 1
+    return total